@@ -3,14 +3,15 @@ Main Flask Application
 Student Attendance & College Management System
 """
 
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_file, g, Response
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_mail import Mail, Message
 from functools import wraps
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 import json
+import functools
 import requests
 from apscheduler.schedulers.background import BackgroundScheduler
 import threading
@@ -21,6 +22,18 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 import atexit
 import random
+import numpy as np
+import time
+import uuid
+import socket
+import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import Pool, QueuePool
+from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST, multiprocess
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'your-secret-key-change-in-production'
@@ -44,6 +57,65 @@ app.config['WEATHER_CITY'] = os.environ.get('WEATHER_CITY') or 'Mumbai'
 # College management email
 app.config['COLLEGE_EMAIL'] = os.environ.get('COLLEGE_EMAIL') or 'college-management@example.com'
 
+# Background jobs - long-running builds and exports run in a local process pool.
+# Pool workers are spawned and import this module, so they skip startup side effects.
+IS_JOB_WORKER = multiprocessing.parent_process() is not None
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS') or 2)
+app.config['JOB_RESULTS_DIR'] = os.environ.get('JOB_RESULTS_DIR') or os.path.join(app.instance_path, 'job_results')
+
+# Attendance analytics - nightly summary of the last ANALYTICS_WINDOW_DAYS days
+app.config['ANALYTICS_WINDOW_DAYS'] = int(os.environ.get('ANALYTICS_WINDOW_DAYS') or 30)
+app.config['ANALYTICS_RECENT_DAYS'] = int(os.environ.get('ANALYTICS_RECENT_DAYS') or 7)
+app.config['ABSENCE_STREAK_THRESHOLD'] = int(os.environ.get('ABSENCE_STREAK_THRESHOLD') or 3)
+app.config['AT_RISK_PERCENT'] = float(os.environ.get('AT_RISK_PERCENT') or 75)
+
+# Attendance archive - closed semesters are moved out of the attendances table into
+# compressed columnar files, one per semester (semesters start on these months)
+app.config['ATTENDANCE_ARCHIVE_DIR'] = os.environ.get('ATTENDANCE_ARCHIVE_DIR') or os.path.join(app.instance_path, 'attendance_archive')
+app.config['SEMESTER_START_MONTHS'] = [int(month) for month in (os.environ.get('SEMESTER_START_MONTHS') or '1,7').split(',')]
+
+# Metrics - every worker writes to PROMETHEUS_MULTIPROC_DIR when it is set so /metrics
+# aggregates across processes (gunicorn etc.); otherwise the in-process registry is used
+REQUEST_COUNT = Counter('http_requests_total', 'HTTP requests', ['method', 'route', 'status'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency', ['method', 'route'])
+DB_POOL_CHECKOUTS = Counter('db_pool_checkouts_total', 'Connections checked out of the DB pool')
+DB_POOL_ACQUIRE = Histogram('db_pool_acquire_seconds',
+                            'Time to get a DB pool connection, including opening a new one when the pool has room',
+                            buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30))
+DB_POOL_IN_USE = Gauge('db_pool_connections_in_use', 'DB connections currently checked out by server processes',
+                       multiprocess_mode='livesum')
+SMTP_LATENCY = Histogram('smtp_send_duration_seconds', 'SMTP send latency', ['kind'])
+SMTP_FAILURES = Counter('smtp_send_failures_total', 'Failed SMTP sends', ['kind'])
+WEATHER_API_LATENCY = Histogram('weather_api_duration_seconds', 'OpenWeatherMap request latency')
+WEATHER_API_RESPONSES = Counter('weather_api_responses_total', 'OpenWeatherMap responses by status code', ['status'])
+JOB_DURATION = Histogram('scheduler_job_duration_seconds', 'Scheduled job duration', ['job'])
+JOB_FAILURES = Counter('scheduler_job_failures_total', 'Scheduled job failures', ['job'])
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers take to get a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_ACQUIRE.observe(time.perf_counter() - start)
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': InstrumentedQueuePool}
+
+# Job pool workers are not marked dead by any server hook, so they stay out of
+# the livesum gauge; a crashed one would otherwise be counted forever
+@event.listens_for(Pool, 'checkout')
+def on_pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKOUTS.inc()
+    if not IS_JOB_WORKER:
+        DB_POOL_IN_USE.inc()
+
+@event.listens_for(Pool, 'checkin')
+def on_pool_checkin(dbapi_connection, connection_record):
+    if not IS_JOB_WORKER:
+        DB_POOL_IN_USE.dec()
+
 db = SQLAlchemy(app)
 bcrypt = Bcrypt(app)
 mail = Mail(app)
@@ -66,7 +138,7 @@ class Student(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     roll_number = db.Column(db.String(50), unique=True, nullable=False)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     department = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120))
     class_mentor_email = db.Column(db.String(120), nullable=False)
@@ -74,13 +146,27 @@ class Student(db.Model):
     
     attendances = db.relationship('Attendance', backref='student', lazy=True)
 
+class StudentSearchToken(db.Model):
+    """Lower-cased name tokens backing the student typeahead search"""
+    __tablename__ = 'student_search_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    token = db.Column(db.String(100), nullable=False)
+    
+    # Covering index so token-prefix lookups never touch the table rows
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'token', name='unique_student_token'),
+        db.Index('ix_student_search_tokens_token', 'token', 'student_id'),
+    )
+
 class Attendance(db.Model):
     """Attendance model"""
     __tablename__ = 'attendances'
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
-    date = db.Column(db.Date, nullable=False)
+    date = db.Column(db.Date, nullable=False, index=True)
     hour = db.Column(db.String(10), nullable=False)
     status = db.Column(db.String(20), nullable=False)
     reason = db.Column(db.Text)
@@ -120,9 +206,126 @@ class WeatherLog(db.Model):
     city = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+class AttendanceSummary(db.Model):
+    """Per-student attendance analytics, rebuilt nightly from attendances"""
+    __tablename__ = 'attendance_summaries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), unique=True, nullable=False)
+    window_start = db.Column(db.Date, nullable=False)
+    window_end = db.Column(db.Date, nullable=False)
+    days_marked = db.Column(db.Integer, nullable=False)
+    attendance_percent = db.Column(db.Float, nullable=False)
+    recent_percent = db.Column(db.Float)
+    current_absence_streak = db.Column(db.Integer, nullable=False)
+    longest_absence_streak = db.Column(db.Integer, nullable=False)
+    at_risk = db.Column(db.Boolean, nullable=False, default=False, index=True)
+    computed_at = db.Column(db.DateTime, default=datetime.now)
+    
+    student = db.relationship('Student', backref=db.backref('summary', uselist=False))
+
+class Job(db.Model):
+    """Background job model for long-running builds and exports"""
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    params = db.Column(db.Text, nullable=False)
+    owner = db.Column(db.String(100))
+    result = db.Column(db.Text)
+    result_path = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
 # Scheduler for weather checks
 scheduler = BackgroundScheduler()
-scheduler.start()
+if not IS_JOB_WORKER:
+    scheduler.start()
+
+def track_job(f):
+    """Record duration and failures of a scheduled job"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return f(*args, **kwargs)
+        except Exception:
+            JOB_FAILURES.labels(job=f.__name__).inc()
+            raise
+        finally:
+            JOB_DURATION.labels(job=f.__name__).observe(time.perf_counter() - start)
+    return decorated_function
+
+def send_mail(msg, kind):
+    """Send an email through Flask-Mail, recording latency and failures"""
+    start = time.perf_counter()
+    try:
+        mail.send(msg)
+    except Exception:
+        SMTP_FAILURES.labels(kind=kind).inc()
+        raise
+    finally:
+        SMTP_LATENCY.labels(kind=kind).observe(time.perf_counter() - start)
+
+def fetch_weather():
+    """Call the OpenWeatherMap current weather API for the configured city"""
+    api_key = app.config['WEATHER_API_KEY']
+    city = app.config['WEATHER_CITY']
+    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
+    
+    start = time.perf_counter()
+    try:
+        response = requests.get(url, timeout=10)
+    except requests.RequestException:
+        WEATHER_API_RESPONSES.labels(status='error').inc()
+        raise
+    finally:
+        WEATHER_API_LATENCY.observe(time.perf_counter() - start)
+    WEATHER_API_RESPONSES.labels(status=str(response.status_code)).inc()
+    return response
+
+# Student search index
+def tokenize_name(name):
+    """Split a name into distinct lower-cased word tokens"""
+    return sorted({token for token in re.split(r'\W+', (name or '').lower()) if token})
+
+def index_student_name(student):
+    """Add search tokens for a student; committed together with the student"""
+    for token in sorted({token[:100] for token in tokenize_name(student.name)}):
+        db.session.add(StudentSearchToken(student_id=student.id, token=token))
+
+# Background job bookkeeping
+def job_owner():
+    """Identify the process whose pool runs a job"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def process_alive(pid):
+    if os.name == 'nt':
+        # Windows only runs the single-process development server
+        return pid == os.getpid()
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def fail_orphaned_jobs():
+    """Fail queued/running jobs owned by processes on this host that no longer exist"""
+    host = socket.gethostname()
+    for job in Job.query.filter(Job.status.in_(['queued', 'running']), Job.owner.like(f"{host}:%")).all():
+        pid = int(job.owner.rsplit(':', 1)[1])
+        if not process_alive(pid):
+            job.status = 'failed'
+            job.error = 'Job was interrupted by a server restart'
+            job.finished_at = datetime.now()
+    db.session.commit()
 
 # Initialize database (only if connection is available)
 def init_db():
@@ -141,22 +344,32 @@ def init_db():
                 db.session.add(admin)
                 db.session.commit()
                 print("Default admin user created: admin/admin123")
+            fail_orphaned_jobs()
+            # Build the search index for students added before it existed. Every
+            # server process gets here on first deploy; the unique constraint lets
+            # one backfill win and the others roll back.
+            if not StudentSearchToken.query.first() and Student.query.first():
+                for student in Student.query.all():
+                    index_student_name(student)
+                try:
+                    db.session.commit()
+                except IntegrityError:
+                    db.session.rollback()
     except Exception as e:
         print(f"Database initialization skipped (connection not available): {e}")
 
 # Try to initialize database on import (will skip if connection fails)
-init_db()
+if not IS_JOB_WORKER:
+    init_db()
 
 # Weather checking function
+@track_job
 def check_weather():
     """Check weather and send alerts if conditions are bad"""
     with app.app_context():
         try:
-            api_key = app.config['WEATHER_API_KEY']
             city = app.config['WEATHER_CITY']
-            url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-            
-            response = requests.get(url, timeout=10)
+            response = fetch_weather()
             if response.status_code == 200:
                 data = response.json()
                 
@@ -201,9 +414,11 @@ def check_weather():
                         recipients=[app.config['COLLEGE_EMAIL']],
                         body=body
                     )
-                    mail.send(msg)
+                    send_mail(msg, 'weather_alert')
                     
         except Exception as e:
+            # Not re-raised: check_weather also runs at import, where it must not stop the app
+            JOB_FAILURES.labels(job='check_weather').inc()
             print(f"Error checking weather: {str(e)}")
 
 # Schedule weather check every hour
@@ -217,7 +432,346 @@ scheduler.add_job(
 )
 
 # Run initial weather check
-check_weather()
+if not IS_JOB_WORKER:
+    check_weather()
+
+# Attendance archive
+def semester_for(day):
+    """Return (label, start, end) of the semester containing day"""
+    months = sorted(app.config['SEMESTER_START_MONTHS'])
+    earlier = [month for month in months if month <= day.month]
+    year, month = (day.year, earlier[-1]) if earlier else (day.year - 1, months[-1])
+    later = [m for m in months if m > month]
+    next_start = date(year, later[0], 1) if later else date(year + 1, months[0], 1)
+    return f"{year}-{month:02d}", date(year, month, 1), next_start - timedelta(days=1)
+
+def archive_path(label):
+    return os.path.join(app.config['ATTENDANCE_ARCHIVE_DIR'], f"attendance_{label}.npz")
+
+@functools.lru_cache(maxsize=4)
+def _read_archive(path, mtime):
+    # Keyed on mtime so a re-archived semester is read again
+    with np.load(path) as archive:
+        return {name: archive[name] for name in archive.files}
+
+def load_archive(label):
+    """Columns of an archived semester, or None if it has not been archived"""
+    path = archive_path(label)
+    if not os.path.exists(path):
+        return None
+    return _read_archive(path, os.path.getmtime(path))
+
+def encode_categories(values):
+    """Store a low-cardinality string column as integer codes plus its distinct values"""
+    categories, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+    return categories, codes.astype(np.uint16)
+
+def archive_semester(label, start, end):
+    """Move a semester's live attendance rows into its archive file, returning the row count"""
+    # Read without locks; rows edited before their batch is deleted are kept live below
+    rows = db.session.query(
+        Attendance.id, Attendance.student_id, Attendance.date, Attendance.hour, Attendance.status,
+        Attendance.reason, Attendance.created_at, Attendance.updated_at
+    ).filter(Attendance.date >= start, Attendance.date <= end).all()
+    db.session.rollback()
+    if not rows:
+        return 0
+    
+    ids, student_ids, dates, hours, statuses, reasons, created, updated = zip(*rows)
+    hour_values, hour_codes = encode_categories(hours)
+    status_values, status_codes = encode_categories(statuses)
+    # Reasons are rare, so only rows that have one are stored
+    reason_rows = np.array([i for i, reason in enumerate(reasons) if reason], dtype=np.int64)
+    columns = {
+        'id': np.array(ids, dtype=np.int64),
+        'student_id': np.array(student_ids, dtype=np.int64),
+        'date': np.array(dates, dtype='datetime64[D]'),
+        'hour': hour_values[hour_codes],
+        'status': status_values[status_codes],
+        'reason_row': reason_rows,
+        'reason': np.array([reasons[i] for i in reason_rows], dtype=str),
+        'created_at': np.array(created, dtype='datetime64[s]'),
+        'updated_at': np.array(updated, dtype='datetime64[s]')
+    }
+    
+    # Re-archiving a semester (late edits) merges with the existing file; live rows win
+    existing = load_archive(label)
+    if existing is not None:
+        existing = dict(existing,
+                        hour=existing['hour_values'][existing['hour_codes']],
+                        status=existing['status_values'][existing['status_codes']])
+        live_keys = set(zip(columns['student_id'].tolist(), columns['date'].tolist(), columns['hour'].tolist()))
+        keep = np.array([
+            key not in live_keys
+            for key in zip(existing['student_id'].tolist(), existing['date'].tolist(), existing['hour'].tolist())
+        ], dtype=bool)
+        offset = len(columns['id'])
+        kept_rows = np.flatnonzero(keep)
+        kept_reasons = np.isin(existing['reason_row'], kept_rows)
+        for name in ('id', 'student_id', 'date', 'hour', 'status', 'created_at', 'updated_at'):
+            columns[name] = np.concatenate([columns[name], existing[name][keep]])
+        columns['reason_row'] = np.concatenate([
+            columns['reason_row'],
+            offset + np.searchsorted(kept_rows, existing['reason_row'][kept_reasons])
+        ])
+        columns['reason'] = np.concatenate([columns['reason'], existing['reason'][kept_reasons]])
+    
+    hour_values, hour_codes = encode_categories(columns.pop('hour'))
+    status_values, status_codes = encode_categories(columns.pop('status'))
+    columns.update(hour_values=hour_values, hour_codes=hour_codes,
+                   status_values=status_values, status_codes=status_codes)
+    
+    # Write the file before deleting live rows; a crash in between only leaves
+    # duplicates, which the next run and query_attendance both resolve
+    path = archive_path(label)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        np.savez_compressed(f, **columns)
+    os.replace(path + '.tmp', path)
+    
+    # Delete in small batches, each locking only its own rows by primary key. A row
+    # whose status changed since it was read stays live (and wins over the archived
+    # copy) until the next run archives it again.
+    archived = {row.id: (row.status, row.updated_at) for row in rows}
+    archived_ids = list(archived)
+    deleted = 0
+    for i in range(0, len(archived_ids), 1000):
+        current = db.session.query(Attendance.id, Attendance.status, Attendance.updated_at).filter(
+            Attendance.id.in_(archived_ids[i:i + 1000])
+        ).with_for_update().all()
+        unchanged = [row.id for row in current if archived[row.id] == (row.status, row.updated_at)]
+        if unchanged:
+            Attendance.query.filter(Attendance.id.in_(unchanged)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(unchanged)
+    return deleted
+
+def archive_closed_semesters(today=None):
+    """Archive every semester that ended before the current one started"""
+    today = today or datetime.now().date()
+    _, current_start, _ = semester_for(today)
+    archived = {}
+    oldest = db.session.query(db.func.min(Attendance.date)).filter(Attendance.date < current_start).scalar()
+    while oldest is not None and oldest < current_start:
+        label, start, end = semester_for(oldest)
+        archived[label] = archive_semester(label, start, end)
+        oldest = db.session.query(db.func.min(Attendance.date)).filter(
+            Attendance.date > end, Attendance.date < current_start
+        ).scalar()
+    return archived
+
+def query_attendance(start_date, end_date, hour=None):
+    """(student_id, date, hour, status) rows between two dates from the live table and the archive"""
+    live_query = db.session.query(
+        Attendance.student_id, Attendance.date, Attendance.hour, Attendance.status
+    ).filter(Attendance.date >= start_date, Attendance.date <= end_date)
+    if hour is not None:
+        live_query = live_query.filter(Attendance.hour == hour)
+    rows = [tuple(row) for row in live_query.all()]
+    
+    live_keys = None
+    day = start_date
+    while day <= end_date:
+        label, _, semester_end = semester_for(day)
+        archive = load_archive(label)
+        if archive is not None:
+            dates = archive['date']
+            mask = (dates >= np.datetime64(start_date)) & (dates <= np.datetime64(end_date))
+            archive_hours = archive['hour_values'][archive['hour_codes']]
+            if hour is not None:
+                mask &= archive_hours == str(hour)
+            if mask.any():
+                if live_keys is None:
+                    live_keys = {(row[0], row[1], row[2]) for row in rows}
+                archived = zip(
+                    archive['student_id'][mask].tolist(),
+                    dates[mask].tolist(),
+                    archive_hours[mask].tolist(),
+                    archive['status_values'][archive['status_codes'][mask]].tolist()
+                )
+                rows.extend(row for row in archived if row[:3] not in live_keys)
+        day = semester_end + timedelta(days=1)
+    return rows
+
+@app.cli.command('archive-attendance')
+def archive_attendance_command():
+    """Move attendance from closed semesters into the archive."""
+    archived = archive_closed_semesters()
+    if not archived:
+        print("No closed semesters with live attendance to archive")
+    for label, count in archived.items():
+        print(f"Archived {count} attendance records for semester {label} to {archive_path(label)}")
+
+# Attendance analytics
+def compute_attendance_summaries(as_of=None):
+    """Rebuild attendance_summaries from the attendance window ending at as_of, returning the row count"""
+    as_of = as_of or datetime.now().date()
+    window_start = as_of - timedelta(days=app.config['ANALYTICS_WINDOW_DAYS'] - 1)
+    recent_start = as_of - timedelta(days=app.config['ANALYTICS_RECENT_DAYS'] - 1)
+    
+    rows = query_attendance(window_start, as_of)
+    
+    summaries = []
+    if rows:
+        student_col, date_col, hour_col, status_col = (np.array(col) for col in zip(*rows))
+        student_ids, student_idx = np.unique(student_col, return_inverse=True)
+        days, day_idx = np.unique(date_col.astype('datetime64[D]'), return_inverse=True)
+        hours, hour_idx = np.unique(hour_col, return_inverse=True)
+        
+        # Student x period matrix: 1 present, -1 absent, 0 not marked.
+        # Periods are sorted by day, so each day is a contiguous block of columns.
+        periods, period_idx = np.unique(day_idx * len(hours) + hour_idx, return_inverse=True)
+        matrix = np.zeros((len(student_ids), len(periods)), dtype=np.int8)
+        matrix[student_idx, period_idx] = np.where(status_col == 'present', 1, -1)
+        
+        # Collapse to student x day. Only days on which attendance was taken are columns,
+        # so weekends and holidays are never part of a streak.
+        day_starts = np.flatnonzero(np.r_[True, np.diff(periods // len(hours)) != 0])
+        marked = np.add.reduceat((matrix != 0).astype(np.int16), day_starts, axis=1)
+        present = np.add.reduceat((matrix == 1).astype(np.int16), day_starts, axis=1)
+        absent_day = (marked > 0) & (present == 0)
+        
+        # Streaks run over each student's own marked days: a day only another
+        # department was marked on must not break them. A stable sort moves each
+        # row's marked days to the front in date order; unmarked days trail as False.
+        student_marked = marked > 0
+        days_marked = student_marked.sum(axis=1)
+        own_days = np.argsort(~student_marked, axis=1, kind='stable')
+        own_absent = np.take_along_axis(absent_day, own_days, axis=1)
+        
+        # Pair up absent run starts and ends from the row-major diff
+        edges = np.diff(np.pad(own_absent.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+        starts = np.argwhere(edges == 1)
+        ends = np.argwhere(edges == -1)
+        lengths = ends[:, 1] - starts[:, 1]
+        longest_streak = np.zeros(len(student_ids), dtype=np.int64)
+        np.maximum.at(longest_streak, starts[:, 0], lengths)
+        
+        # Current streak: the run that ends on the student's latest marked day
+        current_streak = np.zeros(len(student_ids), dtype=np.int64)
+        ongoing = ends[:, 1] == days_marked[ends[:, 0]]
+        current_streak[ends[ongoing, 0]] = lengths[ongoing]
+        
+        attendance_percent = 100.0 * present.sum(axis=1) / marked.sum(axis=1)
+        recent = days >= np.datetime64(recent_start)
+        recent_marked = marked[:, recent].sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            recent_percent = np.where(recent_marked > 0, 100.0 * present[:, recent].sum(axis=1) / recent_marked, np.nan)
+        
+        threshold = app.config['AT_RISK_PERCENT']
+        at_risk = (
+            (current_streak >= app.config['ABSENCE_STREAK_THRESHOLD'])
+            | (attendance_percent < threshold)
+            | (recent_percent < threshold)
+        )
+        
+        computed_at = datetime.now()
+        for i, student_id in enumerate(student_ids.tolist()):
+            summaries.append({
+                'student_id': student_id,
+                'window_start': window_start,
+                'window_end': as_of,
+                'days_marked': int(days_marked[i]),
+                'attendance_percent': round(float(attendance_percent[i]), 2),
+                'recent_percent': None if np.isnan(recent_percent[i]) else round(float(recent_percent[i]), 2),
+                'current_absence_streak': int(current_streak[i]),
+                'longest_absence_streak': int(longest_streak[i]),
+                'at_risk': bool(at_risk[i]),
+                'computed_at': computed_at
+            })
+    
+    # Replace the previous run in one transaction so readers never see a partial table
+    AttendanceSummary.query.delete()
+    if summaries:
+        db.session.execute(db.insert(AttendanceSummary), summaries)
+    db.session.commit()
+    return len(summaries)
+
+def send_mentor_digests():
+    """Email each class mentor one digest of their at-risk students"""
+    at_risk = AttendanceSummary.query.options(db.joinedload(AttendanceSummary.student)).filter_by(
+        at_risk=True
+    ).order_by(AttendanceSummary.current_absence_streak.desc()).all()
+    
+    by_mentor = {}
+    for summary in at_risk:
+        by_mentor.setdefault(summary.student.class_mentor_email, []).append(summary)
+    
+    for mentor_email, summaries in by_mentor.items():
+        lines = []
+        for summary in summaries:
+            lines.append(
+                f"{summary.student.roll_number} - {summary.student.name} ({summary.student.department}): "
+                f"{summary.attendance_percent:.1f}% attendance, "
+                f"{summary.current_absence_streak} day(s) absent in a row"
+            )
+        student_lines = "\n".join(lines)
+        body = f"""
+Attendance Digest
+
+The following students are at risk based on attendance from {summaries[0].window_start} to {summaries[0].window_end}:
+
+{student_lines}
+
+Please follow up with these students.
+"""
+        try:
+            msg = Message(
+                subject=f"Attendance Digest - {len(summaries)} student(s) at risk",
+                recipients=[mentor_email],
+                body=body
+            )
+            send_mail(msg, 'mentor_digest')
+        except Exception as e:
+            print(f"Error sending digest to {mentor_email}: {str(e)}")
+
+@track_job
+def nightly_attendance_analytics():
+    """Rebuild attendance summaries and send mentor digests"""
+    with app.app_context():
+        # Every server process runs this scheduler; the first to insert tonight's
+        # job row does the work and the others hit the primary key and skip
+        today = datetime.now().date()
+        # Runs after midnight, so analyse up to yesterday, the last day with attendance
+        as_of = today - timedelta(days=1)
+        run = Job(
+            id=f"attendance-analytics-{today.isoformat()}",
+            kind='attendance_summary',
+            params=json.dumps({'as_of': as_of.isoformat()}),
+            owner=job_owner(),
+            status='running',
+            started_at=datetime.now()
+        )
+        db.session.add(run)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return
+        
+        try:
+            count = compute_attendance_summaries(as_of)
+            send_mentor_digests()
+        except Exception as e:
+            db.session.rollback()
+            fail_job(run.id, str(e))
+            raise
+        run.status = 'finished'
+        run.progress = 100
+        run.result = json.dumps({'students': count})
+        run.finished_at = datetime.now()
+        db.session.commit()
+
+# Schedule attendance analytics every night
+scheduler.add_job(
+    func=nightly_attendance_analytics,
+    trigger="cron",
+    hour=1,
+    minute=0,
+    id='attendance_analytics',
+    name='Rebuild attendance summaries nightly',
+    replace_existing=True
+)
 
 # Decorator for login required
 def login_required(f):
@@ -240,6 +794,29 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Request metrics
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Label by URL rule, not path, so /seating/<id> stays a single series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.labels(method=request.method, route=route).observe(time.perf_counter() - start)
+        REQUEST_COUNT.labels(method=request.method, route=route, status=response.status_code).inc()
+    return response
+
+@app.route('/metrics')
+def metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
 # Routes
 @app.route('/')
 def index():
@@ -288,18 +865,26 @@ def dashboard():
         Attendance.created_at.desc()
     ).limit(10).all()
     
+    # At-risk students from the nightly attendance summary
+    at_risk_summaries = AttendanceSummary.query.filter_by(at_risk=True).order_by(
+        AttendanceSummary.current_absence_streak.desc(),
+        AttendanceSummary.attendance_percent
+    ).limit(10).all()
+    
     return render_template('dashboard.html',
                          total_students=total_students,
                          today_attendance=today_attendance,
                          latest_weather=latest_weather,
-                         recent_attendances=recent_attendances)
+                         recent_attendances=recent_attendances,
+                         at_risk_summaries=at_risk_summaries)
 
 # Student Management Routes
 @app.route('/students')
 @login_required
 def students():
     students_list = Student.query.all()
-    return render_template('students.html', students=students_list)
+    summaries = {summary.student_id: summary for summary in AttendanceSummary.query.all()}
+    return render_template('students.html', students=students_list, summaries=summaries)
 
 @app.route('/students/add', methods=['GET', 'POST'])
 @login_required
@@ -313,11 +898,53 @@ def add_student():
             class_mentor_email=request.form.get('class_mentor_email')
         )
         db.session.add(student)
+        db.session.flush()
+        index_student_name(student)
         db.session.commit()
         return redirect(url_for('students'))
     
     return render_template('add_student.html')
 
+def like_prefix(value):
+    """LIKE pattern matching values that start with value"""
+    return value.replace('/', '//').replace('%', '/%').replace('_', '/_') + '%'
+
+@app.route('/api/students/search')
+@login_required
+def search_students():
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    if not query or limit < 1:
+        return jsonify({'success': True, 'results': []})
+    
+    # Roll number prefix uses the unique index on students.roll_number
+    matches = Student.query.filter(
+        Student.roll_number.like(like_prefix(query), escape='/')
+    ).order_by(Student.roll_number).limit(limit).all()
+    
+    # Every query token must prefix-match one of the student's name tokens;
+    # the token index narrows the candidates, which are then sorted by name
+    tokens = tokenize_name(query)
+    if tokens and len(matches) < limit:
+        name_query = Student.query.filter(Student.id.notin_([student.id for student in matches]))
+        for token in tokens:
+            name_query = name_query.filter(Student.id.in_(
+                db.select(StudentSearchToken.student_id).where(
+                    StudentSearchToken.token.like(like_prefix(token), escape='/')
+                )
+            ))
+        matches += name_query.order_by(Student.name, Student.id).limit(limit - len(matches)).all()
+    
+    return jsonify({
+        'success': True,
+        'results': [{
+            'id': student.id,
+            'roll_number': student.roll_number,
+            'name': student.name,
+            'department': student.department
+        } for student in matches]
+    })
+
 # Attendance Routes
 @app.route('/attendance')
 @login_required
@@ -325,9 +952,15 @@ def attendance():
     date = request.args.get('date', datetime.now().date().isoformat())
     hour = request.args.get('hour', '1')
     
+    try:
+        day = datetime.strptime(date, '%Y-%m-%d').date()
+    except ValueError:
+        day = datetime.now().date()
+        date = day.isoformat()
+    
     students = Student.query.all()
-    attendance_records = Attendance.query.filter_by(date=date, hour=hour).all()
-    attendance_dict = {record.student_id: record.status for record in attendance_records}
+    # Past semesters may live in the archive rather than the attendances table
+    attendance_dict = {student_id: status for student_id, _, _, status in query_attendance(day, day, hour)}
     
     return render_template('attendance.html',
                          students=students,
@@ -384,7 +1017,7 @@ def mark_attendance():
                     Please follow up with the student regarding their absence.
                     """
                 )
-                mail.send(msg)
+                send_mail(msg, 'absence_alert')
             except Exception as e:
                 print(f"Error sending email: {str(e)}")
     
@@ -403,11 +1036,8 @@ def weather():
 @login_required
 def get_current_weather():
     try:
-        api_key = app.config['WEATHER_API_KEY']
         city = app.config['WEATHER_CITY']
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-        
-        response = requests.get(url, timeout=10)
+        response = fetch_weather()
         if response.status_code == 200:
             data = response.json()
             return jsonify({
@@ -426,143 +1056,96 @@ def get_current_weather():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-# Seat Arrangement Routes
-@app.route('/seating')
-@login_required
-def seating():
-    arrangements = SeatingArrangement.query.order_by(SeatingArrangement.created_at.desc()).all()
-    return render_template('seating.html', arrangements=arrangements)
-
-@app.route('/seating/create', methods=['GET', 'POST'])
-@login_required
-def create_seating():
-    if request.method == 'POST':
-        exam_name = request.form.get('exam_name')
-        num_rooms = int(request.form.get('num_rooms'))
-        seats_per_room = int(request.form.get('seats_per_room'))
-        
-        # Get all students
-        students = Student.query.all()
-        
-        if not students:
-            return render_template('create_seating.html', error='No students found. Please add students first.')
-        
-        # Create rooms
-        rooms = []
-        for i in range(1, num_rooms + 1):
-            room = Room(name=f"Room {i}", capacity=seats_per_room)
-            db.session.add(room)
-            db.session.flush()
-            rooms.append(room)
-        
-        # Arrange students
-        arrangement = SeatingArrangement(
-            exam_name=exam_name,
-            num_rooms=num_rooms,
-            seats_per_room=seats_per_room
-        )
-        db.session.add(arrangement)
-        db.session.flush()
-        
-        # Algorithm: Arrange students ensuring no two same-department students sit together
-        arranged_students = []
-        room_index = 0
-        seat_index = 0
-        
-        # Group students by department
-        dept_students = {}
-        for student in students:
-            if student.department not in dept_students:
-                dept_students[student.department] = []
-            dept_students[student.department].append(student)
-        
-        # Shuffle departments to ensure distribution
-        departments = list(dept_students.keys())
-        random.shuffle(departments)
-        
-        # Round-robin assignment to avoid same department adjacent
-        current_room = rooms[room_index]
-        dept_pointer = 0
-        students_assigned = 0
+# Seat Arrangement
+def build_seating_arrangement(exam_name, num_rooms, seats_per_room, report_progress=None):
+    """Create rooms and a seating arrangement for all students, returning the arrangement"""
+    # Get all students
+    students = Student.query.all()
+    
+    # Create rooms (written after arranging so no transaction is held meanwhile)
+    rooms = [Room(name=f"Room {i}", capacity=seats_per_room) for i in range(1, num_rooms + 1)]
+    
+    # Algorithm: Arrange students ensuring no two same-department students sit together
+    arranged_students = []
+    room_index = 0
+    seat_index = 0
+    
+    # Group students by department
+    dept_students = {}
+    for student in students:
+        if student.department not in dept_students:
+            dept_students[student.department] = []
+        dept_students[student.department].append(student)
+    
+    # Shuffle departments to ensure distribution
+    departments = list(dept_students.keys())
+    random.shuffle(departments)
+    
+    # Round-robin assignment to avoid same department adjacent
+    current_room = rooms[room_index]
+    dept_pointer = 0
+    students_assigned = 0
+    
+    while students_assigned < len(students):
+        # Get next department in round-robin
+        dept = departments[dept_pointer % len(departments)]
         
-        while students_assigned < len(students):
-            # Get next department in round-robin
-            dept = departments[dept_pointer % len(departments)]
+        if dept_students[dept]:
+            student = dept_students[dept].pop(0)
             
-            if dept_students[dept]:
-                student = dept_students[dept].pop(0)
-                
-                # Check if we need to move to next room
-                if seat_index >= seats_per_room:
-                    room_index += 1
-                    if room_index >= num_rooms:
-                        break
-                    current_room = rooms[room_index]
-                    seat_index = 0
-                
-                # Check adjacent seats in same row (avoid same department)
-                # For simplicity, we'll use round-robin which naturally distributes
-                
-                arranged_students.append({
-                    'student': student,
-                    'room': current_room,
-                    'seat': seat_index + 1
-                })
-                
-                seat_index += 1
-                students_assigned += 1
+            # Check if we need to move to next room
+            if seat_index >= seats_per_room:
+                room_index += 1
+                if room_index >= num_rooms:
+                    break
+                current_room = rooms[room_index]
+                seat_index = 0
+                if report_progress:
+                    report_progress(90 * room_index // num_rooms)
             
-            dept_pointer += 1
-        
-        # Save arrangement data as JSON
-        arrangement_data = []
-        for item in arranged_students:
-            arrangement_data.append({
-                'student_id': item['student'].id,
-                'student_name': item['student'].name,
-                'student_roll': item['student'].roll_number,
-                'student_dept': item['student'].department,
-                'room_id': item['room'].id,
-                'room_name': item['room'].name,
-                'seat_number': item['seat']
+            # Check adjacent seats in same row (avoid same department)
+            # For simplicity, we'll use round-robin which naturally distributes
+            
+            arranged_students.append({
+                'student': student,
+                'room': current_room,
+                'seat': seat_index + 1
             })
+            
+            seat_index += 1
+            students_assigned += 1
         
-        arrangement.arrangement_data = json.dumps(arrangement_data)
-        db.session.commit()
-        
-        return redirect(url_for('view_seating', arrangement_id=arrangement.id))
+        dept_pointer += 1
     
-    return render_template('create_seating.html')
-
-@app.route('/seating/<int:arrangement_id>')
-@login_required
-def view_seating(arrangement_id):
-    arrangement = SeatingArrangement.query.get_or_404(arrangement_id)
-    arrangement_data = json.loads(arrangement.arrangement_data)
+    db.session.add_all(rooms)
+    db.session.flush()
     
-    # Organize by room
-    rooms_data = {}
-    for item in arrangement_data:
-        room_name = item['room_name']
-        if room_name not in rooms_data:
-            rooms_data[room_name] = []
-        rooms_data[room_name].append(item)
-    
-    # Sort by seat number
-    for room_name in rooms_data:
-        rooms_data[room_name].sort(key=lambda x: x['seat_number'])
+    # Save arrangement data as JSON
+    arrangement_data = []
+    for item in arranged_students:
+        arrangement_data.append({
+            'student_id': item['student'].id,
+            'student_name': item['student'].name,
+            'student_roll': item['student'].roll_number,
+            'student_dept': item['student'].department,
+            'room_id': item['room'].id,
+            'room_name': item['room'].name,
+            'seat_number': item['seat']
+        })
     
-    return render_template('view_seating.html', arrangement=arrangement, rooms_data=rooms_data)
+    arrangement = SeatingArrangement(
+        exam_name=exam_name,
+        num_rooms=num_rooms,
+        seats_per_room=seats_per_room,
+        arrangement_data=json.dumps(arrangement_data)
+    )
+    db.session.add(arrangement)
+    db.session.commit()
+    return arrangement
 
-@app.route('/seating/<int:arrangement_id>/pdf')
-@login_required
-def download_seating_pdf(arrangement_id):
-    arrangement = SeatingArrangement.query.get_or_404(arrangement_id)
+def render_seating_pdf(arrangement, filepath, report_progress=None):
+    """Write the seating chart PDF for an arrangement to filepath"""
     arrangement_data = json.loads(arrangement.arrangement_data)
-    
-    # Create PDF
-    filename = f"seating_arrangement_{arrangement_id}.pdf"
-    filepath = os.path.join('static', 'pdfs', filename)
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
     
     doc = SimpleDocTemplate(filepath, pagesize=A4)
@@ -582,7 +1165,7 @@ def download_seating_pdf(arrangement_id):
             rooms_data[room_name] = []
         rooms_data[room_name].append(item)
     
-    for room_name in sorted(rooms_data.keys()):
+    for index, room_name in enumerate(sorted(rooms_data.keys()), start=1):
         # Room header
         room_header = Paragraph(f"<b>{room_name}</b>", styles['Heading2'])
         story.append(room_header)
@@ -613,14 +1196,241 @@ def download_seating_pdf(arrangement_id):
         
         story.append(table)
         story.append(Spacer(1, 0.3*inch))
+        if report_progress:
+            report_progress(50 * index // len(rooms_data))
     
     doc.build(story)
+
+# Background Jobs
+def seating_job(job_id, params, report_progress):
+    arrangement = build_seating_arrangement(
+        params['exam_name'],
+        int(params['num_rooms']),
+        int(params['seats_per_room']),
+        report_progress
+    )
+    return {'arrangement_id': arrangement.id}, None
+
+def attendance_summary_job(job_id, params, report_progress):
+    as_of = datetime.strptime(params['as_of'], '%Y-%m-%d').date() if params.get('as_of') else None
+    return {'students': compute_attendance_summaries(as_of)}, None
+
+def seating_pdf_job(job_id, params, report_progress):
+    arrangement = SeatingArrangement.query.get(params['arrangement_id'])
+    if arrangement is None:
+        raise ValueError(f"Seating arrangement {params['arrangement_id']} not found")
+    filepath = os.path.join(app.config['JOB_RESULTS_DIR'], f"{job_id}.pdf")
+    render_seating_pdf(arrangement, filepath, report_progress)
+    return {'filename': f"seating_arrangement_{arrangement.id}.pdf"}, filepath
+
+# Job kind -> handler(job_id, params, report_progress) returning (result, result_path)
+JOB_HANDLERS = {
+    'seating': seating_job,
+    'seating_pdf': seating_pdf_job,
+    'attendance_summary': attendance_summary_job,
+}
+
+# Spawned rather than forked: forking from a request thread while the scheduler
+# thread runs can deadlock, and Windows has no fork at all
+def create_job_executor():
+    return ProcessPoolExecutor(
+        max_workers=app.config['JOB_WORKERS'],
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+job_executor = create_job_executor()
+
+def run_job(job_id):
+    """Execute a queued job inside a job worker process"""
+    with app.app_context():
+        job = Job.query.get(job_id)
+        job.status = 'running'
+        job.started_at = datetime.now()
+        db.session.commit()
+        
+        last_progress = [0]
+        def report_progress(percent):
+            # Written outside the handler's session so partial work is never committed
+            if percent > last_progress[0]:
+                last_progress[0] = percent
+                with db.engine.begin() as connection:
+                    connection.execute(db.update(Job).where(Job.id == job_id).values(progress=percent))
+        
+        try:
+            result, result_path = JOB_HANDLERS[job.kind](job_id, json.loads(job.params), report_progress)
+        except Exception as e:
+            db.session.rollback()
+            job = Job.query.get(job_id)
+            job.status = 'failed'
+            job.error = str(e)
+        else:
+            job = Job.query.get(job_id)
+            job.status = 'finished'
+            job.progress = 100
+            job.result = json.dumps(result)
+            job.result_path = result_path
+        job.finished_at = datetime.now()
+        db.session.commit()
+
+def fail_job(job_id, error):
+    """Mark a job failed unless it already finished"""
+    with db.engine.begin() as connection:
+        connection.execute(db.update(Job).where(
+            Job.id == job_id, Job.status.in_(['queued', 'running'])
+        ).values(status='failed', error=error, finished_at=datetime.now()))
+
+def on_job_done(job_id, future):
+    # Runs in the pool's management thread; catches worker crashes and errors
+    # raised outside the handler, which run_job cannot record itself
+    if future.cancelled():
+        error = 'Job was cancelled'
+    elif future.exception() is not None:
+        error = f"Job worker error: {str(future.exception())}"
+    else:
+        return
+    with app.app_context():
+        fail_job(job_id, error)
+
+def submit_job(kind, params):
+    """Record a job and hand it to the worker pool, returning immediately"""
+    global job_executor
+    job = Job(kind=kind, params=json.dumps(params), owner=job_owner(), created_by=session.get('user_id'))
+    db.session.add(job)
+    db.session.commit()
+    try:
+        try:
+            future = job_executor.submit(run_job, job.id)
+        except BrokenProcessPool:
+            # A worker that died takes the whole pool with it; start a fresh one
+            job_executor = create_job_executor()
+            future = job_executor.submit(run_job, job.id)
+    except Exception as e:
+        fail_job(job.id, f"Could not start job: {str(e)}")
+        db.session.refresh(job)
+    else:
+        future.add_done_callback(functools.partial(on_job_done, job.id))
+    return job
+
+def job_to_dict(job):
+    data = {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error,
+        'result': json.loads(job.result) if job.result else None,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': url_for('get_job', job_id=job.id),
+        'download_url': None,
+        'view_url': None
+    }
+    if job.status == 'finished':
+        if job.result_path:
+            data['download_url'] = url_for('download_job_result', job_id=job.id)
+        if job.kind == 'seating':
+            data['view_url'] = url_for('view_seating', arrangement_id=data['result']['arrangement_id'])
+    return data
+
+@app.route('/api/jobs', methods=['POST'])
+@login_required
+def create_job():
+    data = request.get_json() or {}
+    kind = data.get('kind')
+    if kind not in JOB_HANDLERS:
+        return jsonify({'success': False, 'error': f"Unknown job kind: {kind}"}), 400
+    job = submit_job(kind, data.get('params') or {})
+    return jsonify({'success': True, 'job': job_to_dict(job)}), 202
+
+@app.route('/api/jobs/<job_id>')
+@login_required
+def get_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    return jsonify({'success': True, 'job': job_to_dict(job)})
+
+@app.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    job = Job.query.get_or_404(job_id)
+    return render_template('job.html', job=job)
+
+@app.route('/jobs/<job_id>/download')
+@login_required
+def download_job_result(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.status != 'finished' or not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'success': False, 'error': 'Job result not available'}), 404
+    result = json.loads(job.result) if job.result else {}
+    return send_file(job.result_path, as_attachment=True,
+                     download_name=result.get('filename') or os.path.basename(job.result_path))
+
+# Seat Arrangement Routes
+@app.route('/seating')
+@login_required
+def seating():
+    arrangements = SeatingArrangement.query.order_by(SeatingArrangement.created_at.desc()).all()
+    return render_template('seating.html', arrangements=arrangements)
+
+@app.route('/seating/create', methods=['GET', 'POST'])
+@login_required
+def create_seating():
+    if request.method == 'POST':
+        exam_name = request.form.get('exam_name')
+        num_rooms = int(request.form.get('num_rooms'))
+        seats_per_room = int(request.form.get('seats_per_room'))
+        
+        if not Student.query.first():
+            return render_template('create_seating.html', error='No students found. Please add students first.')
+        
+        # The arrangement is built by a job worker; the job page redirects to it when done
+        job = submit_job('seating', {
+            'exam_name': exam_name,
+            'num_rooms': num_rooms,
+            'seats_per_room': seats_per_room
+        })
+        return redirect(url_for('job_status', job_id=job.id))
+    
+    return render_template('create_seating.html')
+
+@app.route('/seating/<int:arrangement_id>')
+@login_required
+def view_seating(arrangement_id):
+    arrangement = SeatingArrangement.query.get_or_404(arrangement_id)
+    arrangement_data = json.loads(arrangement.arrangement_data)
+    
+    # Organize by room
+    rooms_data = {}
+    for item in arrangement_data:
+        room_name = item['room_name']
+        if room_name not in rooms_data:
+            rooms_data[room_name] = []
+        rooms_data[room_name].append(item)
+    
+    # Sort by seat number
+    for room_name in rooms_data:
+        rooms_data[room_name].sort(key=lambda x: x['seat_number'])
+    
+    return render_template('view_seating.html', arrangement=arrangement, rooms_data=rooms_data)
+
+@app.route('/seating/<int:arrangement_id>/pdf')
+@login_required
+def download_seating_pdf(arrangement_id):
+    arrangement = SeatingArrangement.query.get_or_404(arrangement_id)
     
-    return send_file(filepath, as_attachment=True)
+    # Arrangements never change, so reuse an earlier export instead of rendering another PDF
+    job = Job.query.filter(
+        Job.kind == 'seating_pdf',
+        Job.params == json.dumps({'arrangement_id': arrangement.id}),
+        Job.status.in_(['queued', 'running', 'finished'])
+    ).order_by(Job.created_at.desc()).first()
+    if job is None or (job.status == 'finished' and not os.path.exists(job.result_path)):
+        job = submit_job('seating_pdf', {'arrangement_id': arrangement.id})
+    return redirect(url_for('job_status', job_id=job.id))
 
 if __name__ == '__main__':
     # Ensure database is initialized before starting app
     init_db()
     atexit.register(lambda: scheduler.shutdown())
+    atexit.register(lambda: job_executor.shutdown(wait=False))
     app.run(debug=True, host='0.0.0.0', port=5000)
 
@@ -0,0 +1,11 @@
+"""
+Gunicorn configuration
+Loaded automatically when gunicorn is started from the project directory
+"""
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges (e.g. DB connections in use) from /metrics"""
+    multiprocess.mark_process_dead(worker.pid)
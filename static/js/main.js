@@ -45,3 +45,88 @@ function confirmAction(message) {
     return confirm(message);
 }
 
+
+// Student typeahead search backed by /api/students/search.
+// onSelect receives the chosen student ({id, roll_number, name, department}).
+function initStudentSearch(input, results, onSelect) {
+    let timer = null;
+    let lastQuery = '';
+    
+    function clearResults() {
+        results.innerHTML = '';
+        results.classList.add('d-none');
+    }
+    
+    function render(students) {
+        results.innerHTML = '';
+        if (students.length === 0) {
+            const empty = document.createElement('div');
+            empty.className = 'list-group-item text-muted';
+            empty.textContent = 'No matching students';
+            results.appendChild(empty);
+        }
+        students.forEach(function(student) {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'list-group-item list-group-item-action';
+            const roll = document.createElement('strong');
+            roll.textContent = student.roll_number;
+            item.appendChild(roll);
+            item.appendChild(document.createTextNode(' ' + student.name + ' - ' + student.department));
+            item.addEventListener('click', function() {
+                input.value = '';
+                clearResults();
+                onSelect(student);
+            });
+            results.appendChild(item);
+        });
+        results.classList.remove('d-none');
+    }
+    
+    input.addEventListener('input', function() {
+        const query = input.value.trim();
+        clearTimeout(timer);
+        if (!query) {
+            lastQuery = '';
+            clearResults();
+            return;
+        }
+        timer = setTimeout(function() {
+            lastQuery = query;
+            fetch(input.dataset.searchUrl + '?q=' + encodeURIComponent(query))
+            .then(response => response.json())
+            .then(data => {
+                // Ignore responses for queries the user has already typed past
+                if (query === lastQuery) {
+                    render(data.results || []);
+                }
+            })
+            .catch(error => console.error('Error:', error));
+        }, 150);
+    });
+    
+    input.addEventListener('keydown', function(event) {
+        if (event.key === 'Escape') {
+            clearResults();
+        } else if (event.key === 'Enter') {
+            event.preventDefault();
+            const first = results.querySelector('button');
+            if (first) {
+                first.click();
+            }
+        }
+    });
+}
+
+// Scroll a student's table row into view and highlight it briefly
+function highlightStudentRow(studentId) {
+    const row = document.getElementById('student-' + studentId);
+    if (!row) {
+        return;
+    }
+    row.scrollIntoView({behavior: 'smooth', block: 'center'});
+    row.classList.add('table-warning');
+    setTimeout(function() {
+        row.classList.remove('table-warning');
+    }, 2000);
+}